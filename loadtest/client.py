@@ -0,0 +1,170 @@
+import http.client
+import random
+import re
+import socket
+import time
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, build_opener
+
+# Set by loadtest.middleware on responses that failed in ways the status code alone doesn't show
+ERROR_HEADER = 'X-Load-Test-Error'
+# The status each scenario returns when it succeeds - saves and actions redirect back to the changelist
+EXPECTED_STATUS = {
+    'changelist': 200,
+    'search': 200,
+    'change_form_save': 302,
+    'bulk_action': 302,
+    'export': 200,
+}
+SCENARIOS = tuple(EXPECTED_STATUS)
+LOGIN_PATH = '/admin/login/'
+LOGIN_ATTEMPTS = 5
+SEARCH_TERMS = ('the', 'data', 'system', 'people', 'result', 'world', 'policy', 'report')
+EXPORT_FORMAT_PATTERN = re.compile(r'<option value="(\d+)"[^>]*>\s*csv\s*</option>', re.IGNORECASE)
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    """ Return redirects to the caller instead of following them, so each timing covers a single request """
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Result:
+    """ The outcome of a single timed request """
+
+    __slots__ = ('scenario', 'started', 'elapsed', 'status', 'error')
+
+    def __init__(self, scenario, started, elapsed, status, error=None):
+        self.scenario = scenario
+        self.started = started
+        self.elapsed = elapsed
+        self.status = status
+        # None for a successful request, otherwise 'lock-timeout', 'action-failed', 'timeout', 'http' or 'connection'
+        self.error = error
+
+
+class AdminClient:
+    """ A logged in admin user replaying a weighted mix of admin scenarios against the server """
+
+    def __init__(self, base_url, username, password, blog_ids, comment_ids, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.blog_ids = blog_ids
+        self.comment_ids = comment_ids
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirectHandler())
+        self.export_format = '0'
+
+    def request(self, path, data=None):
+        """ Send a GET, or a POST when data is given, and return (status, headers, body) """
+        if data is not None:
+            data = urlencode({**data, 'csrfmiddlewaretoken': self.csrf_token()}, doseq=True).encode()
+
+        try:
+            response = self.opener.open(f'{self.base_url}{path}', data=data, timeout=self.timeout)
+        except HTTPError as e:
+            # Raised for redirects too, as they are not followed
+            with e:
+                return e.code, e.headers, e.read()
+
+        with response:
+            return response.status, response.headers, response.read()
+
+    def csrf_token(self):
+        """ Django accepts the csrftoken cookie value as the form token """
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+
+        return ''
+
+    def login(self):
+        """
+        Log in through the admin login form, raising RuntimeError if the credentials are rejected.
+        Every client logs in at once, so a login that hits a lock timeout is retried with backoff
+        """
+        self.request(LOGIN_PATH)
+        for attempt in range(0, LOGIN_ATTEMPTS):
+            status, headers, _ = self.request(LOGIN_PATH, {
+                'username': self.username,
+                'password': self.password,
+                'next': '/admin/',
+            })
+            # Whatever the status, e.g. a 500 when saving the session hit the lock
+            if headers.get(ERROR_HEADER) != 'lock-timeout':
+                break
+            time.sleep(0.1 * 2 ** attempt + random.random() * 0.1)
+
+        if status != 302:
+            raise RuntimeError(f'Unable to log in as {self.username} (status {status})')
+
+        # Look up the CSV option up front, so export timings only cover the export itself
+        _, _, body = self.request('/admin/main/comment/export/')
+        match = EXPORT_FORMAT_PATTERN.search(body.decode(errors='replace'))
+        self.export_format = match.group(1) if match else '0'
+
+    def run(self, scenario):
+        """ Run a single scenario and time it """
+        started = time.perf_counter()
+        try:
+            status, headers, _ = getattr(self, scenario)()
+        except (socket.timeout, TimeoutError):
+            return Result(scenario, started, time.perf_counter() - started, None, 'timeout')
+        except URLError as e:
+            error = 'timeout' if isinstance(e.reason, (socket.timeout, TimeoutError)) else 'connection'
+            return Result(scenario, started, time.perf_counter() - started, None, error)
+        except (http.client.HTTPException, OSError):
+            return Result(scenario, started, time.perf_counter() - started, None, 'connection')
+
+        elapsed = time.perf_counter() - started
+        error = None
+        if headers.get(ERROR_HEADER) in ('lock-timeout', 'action-failed'):
+            error = headers[ERROR_HEADER]
+        elif status != EXPECTED_STATUS[scenario] or LOGIN_PATH in headers.get('Location', ''):
+            # Includes redirects to the login page from a lost session, which would otherwise look like fast successes
+            error = 'http'
+
+        return Result(scenario, started, elapsed, status, error)
+
+    def changelist(self):
+        """ Browse a random page of the Blog or Comment changelist """
+        model, ids = random.choice((('blog', self.blog_ids), ('comment', self.comment_ids)))
+        pages = max(1, len(ids) // 50)
+        return self.request(f'/admin/main/{model}/?p={random.randrange(pages)}')
+
+    def search(self):
+        """ Search Blog titles or Comment text """
+        model = random.choice(('blog', 'comment'))
+        return self.request(f'/admin/main/{model}/?{urlencode({"q": random.choice(SEARCH_TERMS)})}')
+
+    def change_form_save(self):
+        """ Save a Comment through its change form - the form is re-rendered with a 200 when validation fails """
+        comment_id = random.choice(self.comment_ids)
+        return self.request(f'/admin/main/comment/{comment_id}/change/', {
+            'blog': random.choice(self.blog_ids),
+            'comment': f'Edited by {self.username} at {time.time()}',
+            'is_active': 'on',
+            '_save': 'Save',
+        })
+
+    def bulk_action(self):
+        """ Run one of the custom admin actions over a random selection of records """
+        model, action, ids = random.choice((
+            ('blog', 'set_blogs_to_published', self.blog_ids),
+            ('comment', 'set_comment_to_inactive', self.comment_ids),
+        ))
+        return self.request(f'/admin/main/{model}/', {
+            'action': action,
+            '_selected_action': random.sample(ids, min(len(ids), 25)),
+            'select_across': 0,
+            'index': 0,
+        })
+
+    def export(self):
+        """ Export all Comments as CSV through django-import-export """
+        return self.request('/admin/main/comment/export/', {'file_format': self.export_format})
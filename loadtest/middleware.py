@@ -0,0 +1,46 @@
+from django.contrib import messages
+from django.db import OperationalError, connection
+
+from .client import ERROR_HEADER
+
+
+class LoadTestErrorMiddleware:
+    """
+    Tag requests that failed in ways the status code alone hides, so the load test can count them.
+    Must be first in MIDDLEWARE, so queries run by the other middleware (e.g. saving the session) are seen too
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        locked = []
+
+        def record_locks(execute, sql, params, many, context):
+            """ Note any query that timed out waiting on a SQLite lock, even if the caller swallows the error """
+            try:
+                return execute(sql, params, many, context)
+            except OperationalError as e:
+                if 'database is locked' in str(e):
+                    locked.append(e)
+                raise
+
+        with connection.execute_wrapper(record_locks):
+            response = self.get_response(request)
+
+        if locked:
+            response[ERROR_HEADER] = 'lock-timeout'
+        elif self.has_queued_warning(request):
+            response[ERROR_HEADER] = 'action-failed'
+
+        return response
+
+    @staticmethod
+    def has_queued_warning(request):
+        """
+        The custom admin actions catch their own errors and only queue a warning message before redirecting.
+        Iterating the storage would mark the messages as used and drop them, so read the queue directly
+        """
+        storage = getattr(request, '_messages', None)
+        queued = getattr(storage, '_queued_messages', ())
+        return any(message.level == messages.WARNING for message in queued)
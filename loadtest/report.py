@@ -0,0 +1,117 @@
+import json
+import math
+
+ERROR_TYPES = ('lock-timeout', 'action-failed', 'timeout', 'http', 'connection')
+COMPARED_METRICS = ('throughput', 'p50', 'p95', 'p99', 'error_rate', 'lock_timeout_rate')
+
+
+def percentile(sorted_values, pct):
+    """ Nearest-rank percentile of an already sorted list """
+    if not sorted_values:
+        return None
+
+    rank = max(1, math.ceil(len(sorted_values) * pct / 100))
+    return sorted_values[rank - 1]
+
+
+def summarise(results, duration):
+    """ Summarise a list of Results into throughput, latency percentiles (ms) and error rates """
+    count = len(results)
+    errors = {error: sum(1 for r in results if r.error == error) for error in ERROR_TYPES}
+    # Latency is only meaningful for requests the server actually answered successfully
+    latencies = sorted(r.elapsed * 1000 for r in results if r.error is None)
+    total_errors = sum(errors.values())
+
+    return {
+        'requests': count,
+        'successful': count - total_errors,
+        'throughput': (count - total_errors) / duration if duration else 0,
+        'p50': percentile(latencies, 50),
+        'p95': percentile(latencies, 95),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1] if latencies else None,
+        'errors': errors,
+        'error_rate': total_errors / count if count else 0,
+        'lock_timeout_rate': errors['lock-timeout'] / count if count else 0,
+    }
+
+
+def build_report(app, config, results, duration):
+    """ Build the report for one app - overall figures plus one entry per scenario """
+    scenarios = sorted({r.scenario for r in results})
+    return {
+        'app': app,
+        'config': config,
+        'duration': duration,
+        'overall': summarise(results, duration),
+        'scenarios': {
+            scenario: summarise([r for r in results if r.scenario == scenario], duration)
+            for scenario in scenarios
+        },
+    }
+
+
+def save_reports(reports, path):
+    """ Save the reports of a run as JSON, to be used as the baseline of a later run """
+    with open(path, 'w') as f:
+        json.dump({report['app']: report for report in reports}, f, indent=2)
+
+
+def load_reports(path):
+    """ Load the reports of a previous run, keyed by app """
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_value(metric, value):
+    """ Format a metric for display - rates as percentages, latencies in ms """
+    if value is None:
+        return '-'
+    if metric.endswith('rate'):
+        return f'{value * 100:.2f}%'
+    if metric == 'throughput':
+        return f'{value:.1f}/s'
+
+    return f'{value:.1f}ms'
+
+
+def format_change(metric, current, previous):
+    """ Format the relative change from the baseline for display """
+    if current is None or previous is None:
+        return ''
+    if metric.endswith('rate'):
+        return f'{(current - previous) * 100:+.2f}pp'
+    if not previous:
+        return ''
+
+    return f'{(current - previous) / previous * 100:+.1f}%'
+
+
+def format_report(report, baseline=None):
+    """ Render a report as a text table, with the change from the baseline report if one is given """
+    rows = [('overall', report['overall'])] + list(report['scenarios'].items())
+    previous_rows = {}
+    if baseline:
+        previous_rows = {'overall': baseline['overall'], **baseline['scenarios']}
+
+    lines = [
+        f'{report["app"].upper()} - {report["overall"]["requests"]} requests in {report["duration"]:.1f}s '
+        f'from {report["config"]["clients"]} clients'
+    ]
+    header = f'{"scenario":<18}{"requests":>10}' + ''.join(f'{metric:>20}' for metric in COMPARED_METRICS)
+    lines.append(header)
+    lines.append('-' * len(header))
+    for name, stats in rows:
+        previous = previous_rows.get(name)
+        cells = []
+        for metric in COMPARED_METRICS:
+            cell = format_value(metric, stats[metric])
+            if previous:
+                change = format_change(metric, stats[metric], previous.get(metric))
+                cell = f'{cell} ({change})' if change else cell
+            cells.append(f'{cell:>20}')
+        lines.append(f'{name:<18}{stats["requests"]:>10}' + ''.join(cells))
+
+    errors = report['overall']['errors']
+    lines.append('errors: ' + ', '.join(f'{error}={errors[error]}' for error in ERROR_TYPES))
+    return '\n'.join(lines)
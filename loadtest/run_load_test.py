@@ -0,0 +1,279 @@
+"""
+Concurrent end-to-end load test of the admin against the WSGI and ASGI apps.
+
+Seeds a throwaway SQLite database, boots Blog.wsgi.application and/or
+Blog.asgi.application under a multi-worker gunicorn server, then replays a
+weighted mix of admin requests from many concurrently logged in clients.
+
+Run from the project directory, e.g.
+
+    python -m loadtest.run_load_test --app both --clients 50 --duration 60 --output results.json
+    python -m loadtest.run_load_test --app both --clients 50 --duration 60 --baseline results.json
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import math
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from .client import SCENARIOS, AdminClient
+from .report import build_report, format_report, load_reports, save_reports
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = 'load-test-password'
+DEFAULT_MIX = 'changelist=50,search=20,change_form_save=15,bulk_action=10,export=5'
+SERVER_COMMANDS = {
+    'wsgi': ['Blog.wsgi:application'],
+    'asgi': ['Blog.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def parse_mix(value):
+    """ Parse a mix such as "changelist=50,search=20" into a dict of scenario weights """
+    mix = {}
+    for item in value.split(','):
+        scenario, _, weight = item.partition('=')
+        scenario = scenario.strip()
+        if scenario not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f'Unknown scenario: {scenario}')
+        try:
+            mix[scenario] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'Invalid weight for {scenario}: {weight}')
+        if not math.isfinite(mix[scenario]) or mix[scenario] < 0:
+            raise argparse.ArgumentTypeError(f'Invalid weight for {scenario}: {weight}')
+
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError('At least one scenario needs a positive weight')
+
+    return mix
+
+
+def parse_args(argv=None):
+    """ Parse the command line options """
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--app', choices=('wsgi', 'asgi', 'both'), default='both')
+    parser.add_argument('--clients', type=int, default=20, help='Number of concurrent logged in clients')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds per app')
+    parser.add_argument('--warmup', type=float, default=5, help='Unmeasured seconds before each measurement')
+    parser.add_argument('--workers', type=int, default=4, help='Server worker processes')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per WSGI worker')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Scenario weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--db-timeout', type=float, default=5,
+                        help='Seconds SQLite waits on a lock before the request fails')
+    parser.add_argument('--request-timeout', type=float, default=30, help='Client side timeout per request')
+    parser.add_argument('--output', help='Save the results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against the JSON results of a previous run')
+    args = parser.parse_args(argv)
+    if args.clients < 1 or args.workers < 1 or args.threads < 1:
+        parser.error('--clients, --workers and --threads must be at least 1')
+
+    return args
+
+
+def server_env(db_path, db_timeout):
+    """ Environment for manage.py and the servers - points Django at the load test settings and database """
+    env = dict(os.environ)
+    env['DJANGO_SETTINGS_MODULE'] = 'loadtest.settings'
+    env['LOAD_TEST_DB'] = str(db_path)
+    env['LOAD_TEST_DB_TIMEOUT'] = str(db_timeout)
+    # Blog.settings requires a SECRET_KEY, which may otherwise only be in the developer's .env
+    env.setdefault('SECRET_KEY', 'load-test-secret-key')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, (str(BASE_DIR), env.get('PYTHONPATH'))))
+    return env
+
+
+def create_database(db_path, users, db_timeout):
+    """ Migrate and seed a fresh database, returning the seeded Blog and Comment ids """
+    env = server_env(db_path, db_timeout)
+    manage = [sys.executable, str(BASE_DIR / 'manage.py')]
+    subprocess.run(manage + ['migrate', '--noinput'], cwd=BASE_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    subprocess.run(
+        manage + ['shell', '-c', (
+            'from loadtest.seed_users import generate_load_test_data; '
+            f'generate_load_test_data({users}, {PASSWORD!r})'
+        )],
+        cwd=BASE_DIR, env=env, check=True,
+    )
+
+    with contextlib.closing(sqlite3.connect(db_path)) as connection:
+        blog_ids = [row[0] for row in connection.execute('SELECT id FROM main_blog')]
+        comment_ids = [row[0] for row in connection.execute('SELECT id FROM main_comment')]
+
+    return blog_ids, comment_ids
+
+
+def free_port():
+    """ Ask the OS for an unused local port """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port, env, args):
+    """ Start gunicorn serving the app and wait until it accepts connections """
+    command = [
+        sys.executable, '-m', 'gunicorn', *SERVER_COMMANDS[app],
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(args.workers),
+        '--timeout', str(int(args.request_timeout) + 30),
+        '--log-level', 'warning',
+    ]
+    if app == 'wsgi':
+        command += ['--threads', str(args.threads)]
+
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'The {app} server exited with code {server.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+
+    stop_server(server)
+    raise RuntimeError(f'The {app} server did not start listening on port {port}')
+
+
+def stop_server(server):
+    """ Shut the server down gracefully, killing it if it doesn't stop in time """
+    server.terminate()
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def run_clients(base_url, blog_ids, comment_ids, args):
+    """ Log every client in, then replay the scenario mix concurrently and return the measured Results """
+    clients = [
+        AdminClient(base_url, f'loadtest_{i}', PASSWORD, blog_ids, comment_ids, timeout=args.request_timeout)
+        for i in range(0, args.clients)
+    ]
+    scenarios = list(args.mix)
+    weights = list(args.mix.values())
+    results = [[] for _ in clients]
+    login_errors = []
+    replay_errors = []
+    timings = {}
+
+    def start_clock():
+        """ Runs once every client has logged in, so logins are never part of the measurement """
+        start = time.perf_counter()
+        timings['measure_from'] = start + args.warmup
+        timings['deadline'] = start + args.warmup + args.duration
+
+    ready = threading.Barrier(len(clients), action=start_clock)
+
+    def worker(index, client):
+        """ Log in, wait for the other clients, then keep running scenarios until the deadline """
+        try:
+            client.login()
+        except Exception as e:
+            login_errors.append(e)
+        ready.wait()
+        if login_errors:
+            return
+
+        try:
+            while True:
+                scenario = random.choices(scenarios, weights)[0]
+                result = client.run(scenario)
+                if result.started >= timings['deadline']:
+                    break
+                results[index].append(result)
+        except Exception as e:
+            replay_errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i, client), daemon=True) for i, client in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if login_errors:
+        raise login_errors[0]
+    # A bug in the client must not be mistaken for a run with no requests
+    if replay_errors:
+        raise replay_errors[0]
+
+    return [result for client_results in results for result in client_results
+            if result.started >= timings['measure_from']]
+
+
+def run_app(app, template_db, workdir, blog_ids, comment_ids, args):
+    """ Load test a single app against its own copy of the seeded database and return its report """
+    db_path = Path(workdir) / f'{app}.sqlite3'
+    shutil.copyfile(template_db, db_path)
+    port = free_port()
+    server = start_server(app, port, server_env(db_path, args.db_timeout), args)
+    try:
+        results = run_clients(f'http://127.0.0.1:{port}', blog_ids, comment_ids, args)
+    finally:
+        stop_server(server)
+
+    config = {
+        'clients': args.clients,
+        'workers': args.workers,
+        'threads': args.threads if app == 'wsgi' else None,
+        'mix': args.mix,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'db_timeout': args.db_timeout,
+    }
+    return build_report(app, config, results, args.duration)
+
+
+def main(argv=None):
+    """ Seed the database, load test each app and report the results """
+    args = parse_args(argv)
+    apps = ('wsgi', 'asgi') if args.app == 'both' else (args.app,)
+
+    missing = [module for module in ('gunicorn', 'uvicorn') if importlib.util.find_spec(module) is None]
+    if 'asgi' not in apps and 'uvicorn' in missing:
+        missing.remove('uvicorn')
+    if missing:
+        sys.exit(f'Missing {", ".join(missing)} - run `pip install -r requirements-loadtest.txt`')
+
+    baseline = load_reports(args.baseline) if args.baseline else {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        template_db = Path(workdir) / 'template.sqlite3'
+        print('Seeding load test database...')
+        blog_ids, comment_ids = create_database(template_db, args.clients, args.db_timeout)
+
+        reports = []
+        for app in apps:
+            print(f'Load testing {app} with {args.clients} clients for {args.duration:.0f}s...')
+            reports.append(run_app(app, template_db, workdir, blog_ids, comment_ids, args))
+
+    for report in reports:
+        previous = baseline.get(report['app'])
+        if previous and previous['config'] != report['config']:
+            print(f'Warning: the {report["app"]} baseline was run with a different configuration')
+        print()
+        print(format_report(report, previous))
+
+    if args.output:
+        save_reports(reports, args.output)
+        print(f'\nResults saved to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+
+from seed.seed_data import generate_seed_data
+
+
+def generate_user_data(count, password):
+    """ Generate the superusers the load test clients log in as """
+    User = get_user_model()
+    users = [
+        User(username=f'loadtest_{i}', email=f'loadtest_{i}@example.com', is_staff=True, is_superuser=True)
+        for i in range(0, count)
+    ]
+    for user in users:
+        user.set_password(password)
+    User.objects.bulk_create(users)
+
+
+def generate_load_test_data(users, password):
+    """ Generates seed data for all models, plus the load test users """
+    generate_seed_data()
+    generate_user_data(users, password)
@@ -0,0 +1,33 @@
+"""
+Django settings used by the load test harness.
+
+Extends the project settings so the servers booted by the harness run the real
+Blog.wsgi and Blog.asgi applications, but against a throwaway SQLite database
+instead of the development db.sqlite3.
+"""
+
+import os
+
+from Blog.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['LOAD_TEST_DB'],
+        # Seconds SQLite waits on a locked database before raising "database is locked"
+        'OPTIONS': {
+            'timeout': float(os.environ.get('LOAD_TEST_DB_TIMEOUT', 5)),
+        },
+    }
+}
+
+# Report lock timeouts and failed admin actions separately from other server errors. It goes first
+# so lock timeouts in the other middleware, such as saving the session, are tagged too
+MIDDLEWARE = ['loadtest.middleware.LoadTestErrorMiddleware'] + MIDDLEWARE  # noqa: F405
+
+# Logging in hundreds of clients with PBKDF2 would dominate the warm up, and login isn't measured
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,87 @@
+import http.client
+import socket
+from unittest import TestCase, mock
+from urllib.error import URLError
+
+from ..client import ERROR_HEADER, LOGIN_ATTEMPTS, AdminClient
+
+EXPORT_FORM = b'<option value="2">json</option><option value="3">csv</option>'
+
+
+def make_client(*responses):
+    """ Build a client whose request() returns (or raises) each of the given responses in turn """
+    client = AdminClient('http://testserver', 'loadtest_0', 'password', [1, 2, 3], [4, 5, 6])
+    client.request = mock.Mock(side_effect=responses)
+    return client
+
+
+class RunTests(TestCase):
+
+    def test_expected_status_is_a_success(self):
+        for scenario, status in (('changelist', 200), ('search', 200), ('export', 200),
+                                 ('change_form_save', 302), ('bulk_action', 302)):
+            with self.subTest(scenario=scenario):
+                headers = {'Location': '/admin/main/comment/'} if status == 302 else {}
+                result = make_client((status, headers, b'')).run(scenario)
+                self.assertIsNone(result.error)
+                self.assertEqual(result.status, status)
+
+    def test_unexpected_status_is_an_http_error(self):
+        for scenario, status in (('changelist', 302), ('export', 500), ('change_form_save', 200),
+                                 ('bulk_action', 403)):
+            with self.subTest(scenario=scenario):
+                result = make_client((status, {}, b'')).run(scenario)
+                self.assertEqual(result.error, 'http')
+
+    def test_redirect_to_the_login_page_is_an_http_error(self):
+        result = make_client((302, {'Location': '/admin/login/?next=/admin/main/blog/'}, b'')).run('bulk_action')
+        self.assertEqual(result.error, 'http')
+
+    def test_tagged_responses_whatever_the_status(self):
+        for tag, status in (('lock-timeout', 500), ('lock-timeout', 302), ('action-failed', 302)):
+            with self.subTest(tag=tag, status=status):
+                result = make_client((status, {ERROR_HEADER: tag}, b'')).run('bulk_action')
+                self.assertEqual(result.error, tag)
+
+    def test_timeouts(self):
+        for exception in (socket.timeout(), TimeoutError(), URLError(socket.timeout())):
+            with self.subTest(exception=exception):
+                self.assertEqual(make_client(exception).run('changelist').error, 'timeout')
+
+    def test_connection_errors(self):
+        for exception in (URLError(ConnectionRefusedError()), ConnectionResetError(),
+                          http.client.RemoteDisconnected()):
+            with self.subTest(exception=exception):
+                result = make_client(exception).run('changelist')
+                self.assertEqual(result.error, 'connection')
+                self.assertIsNone(result.status)
+
+
+@mock.patch('loadtest.client.time.sleep')
+class LoginTests(TestCase):
+
+    def test_login(self, sleep):
+        client = make_client((200, {}, b''), (302, {}, b''), (200, {}, EXPORT_FORM))
+        client.login()
+        self.assertEqual(client.export_format, '3')
+        sleep.assert_not_called()
+
+    def test_retries_lock_timeouts_whatever_the_status(self, sleep):
+        locked = (500, {ERROR_HEADER: 'lock-timeout'}, b'')
+        client = make_client((200, {}, b''), locked, locked, (302, {}, b''), (200, {}, EXPORT_FORM))
+        client.login()
+        self.assertEqual(client.request.call_count, 5)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_gives_up_after_the_last_attempt(self, sleep):
+        locked = (503, {ERROR_HEADER: 'lock-timeout'}, b'')
+        client = make_client((200, {}, b''), *[locked] * LOGIN_ATTEMPTS)
+        with self.assertRaises(RuntimeError):
+            client.login()
+        self.assertEqual(client.request.call_count, LOGIN_ATTEMPTS + 1)
+
+    def test_rejected_credentials_are_not_retried(self, sleep):
+        client = make_client((200, {}, b''), (200, {}, b''))
+        with self.assertRaises(RuntimeError):
+            client.login()
+        sleep.assert_not_called()
@@ -0,0 +1,111 @@
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.handlers.exception import convert_exception_to_response
+from django.db import OperationalError, connection
+from django.http import HttpResponse, HttpResponseRedirect
+from django.test import RequestFactory, TestCase
+
+from ..client import ERROR_HEADER
+from ..middleware import LoadTestErrorMiddleware
+
+
+def lock_database(execute, sql, params, many, context):
+    """ Fail every query as if SQLite timed out waiting on a lock """
+    raise OperationalError('database is locked')
+
+
+def lock_sessions(execute, sql, params, many, context):
+    """ Fail queries on the session table as if SQLite timed out waiting on a lock """
+    if 'django_session' in sql:
+        raise OperationalError('database is locked')
+
+    return execute(sql, params, many, context)
+
+
+def with_locked_sessions(get_response):
+    """ Middleware that locks the session table for everything it wraps """
+    def middleware(request):
+        with connection.execute_wrapper(lock_sessions):
+            return get_response(request)
+
+    return middleware
+
+
+def query_view(request):
+    """ Runs a query that succeeds """
+    list(User.objects.all())
+    return HttpResponse()
+
+
+def locked_view(request):
+    """ Runs a query that hits the lock and lets the error propagate """
+    with connection.execute_wrapper(lock_database):
+        list(User.objects.all())
+
+
+def swallowed_lock_view(request):
+    """ Behaves like the custom admin actions - swallows the error and queues a warning """
+    try:
+        with connection.execute_wrapper(lock_database):
+            list(User.objects.all())
+    except:
+        messages.add_message(request, messages.WARNING, 'Unable to publish selected Blog')
+
+    return HttpResponseRedirect('/admin/main/blog/')
+
+
+def session_view(request):
+    """ Modifies the session, so SessionMiddleware saves it after the view """
+    request.session['visited'] = True
+    return HttpResponse()
+
+
+class LoadTestErrorMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.request = RequestFactory().post('/admin/main/blog/')
+        self.request._messages = CookieStorage(self.request)
+
+    def get_response(self, get_response):
+        """ Run the middleware in front of get_response, which is wrapped the way Django wraps the middleware chain """
+        return LoadTestErrorMiddleware(convert_exception_to_response(get_response))(self.request)
+
+    def test_successful_request_is_not_tagged(self):
+        response = self.get_response(query_view)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(ERROR_HEADER, response)
+
+    def test_lock_timeout_in_the_view(self):
+        with self.assertLogs('django.request', 'ERROR'):
+            response = self.get_response(locked_view)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response[ERROR_HEADER], 'lock-timeout')
+
+    def test_lock_timeout_in_other_middleware(self):
+        with self.assertLogs('django.request', 'ERROR'):
+            response = self.get_response(with_locked_sessions(SessionMiddleware(session_view)))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response[ERROR_HEADER], 'lock-timeout')
+
+    def test_swallowed_lock_timeout(self):
+        response = self.get_response(swallowed_lock_view)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response[ERROR_HEADER], 'lock-timeout')
+
+    def test_swallowed_error_with_a_warning(self):
+        def view(request):
+            messages.add_message(request, messages.WARNING, 'Unable to publish selected Blog')
+            return HttpResponseRedirect('/admin/main/blog/')
+
+        response = self.get_response(view)
+        self.assertEqual(response[ERROR_HEADER], 'action-failed')
+
+    def test_other_messages_are_not_tagged(self):
+        def view(request):
+            messages.add_message(request, messages.SUCCESS, '1 Blog has been successfully published')
+            return HttpResponseRedirect('/admin/main/blog/')
+
+        response = self.get_response(view)
+        self.assertNotIn(ERROR_HEADER, response)
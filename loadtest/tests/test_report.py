@@ -0,0 +1,105 @@
+import argparse
+from unittest import TestCase
+
+from ..client import Result
+from ..report import format_change, percentile, summarise
+from ..run_load_test import parse_mix
+
+
+def result(error=None, elapsed=0.1, scenario='changelist'):
+    """ Build a Result for the summary tests """
+    return Result(scenario, 0, elapsed, 200, error)
+
+
+class PercentileTests(TestCase):
+
+    def test_empty_list_has_no_percentile(self):
+        self.assertIsNone(percentile([], 50))
+
+    def test_single_value_is_every_percentile(self):
+        for pct in (1, 50, 99, 100):
+            self.assertEqual(percentile([7], pct), 7)
+
+    def test_nearest_rank(self):
+        values = [15, 20, 35, 40, 50]
+        self.assertEqual(percentile(values, 5), 15)
+        self.assertEqual(percentile(values, 30), 20)
+        self.assertEqual(percentile(values, 40), 20)
+        self.assertEqual(percentile(values, 50), 35)
+        self.assertEqual(percentile(values, 100), 50)
+
+    def test_high_percentiles_of_small_lists_are_the_max(self):
+        values = list(range(1, 11))
+        self.assertEqual(percentile(values, 95), 10)
+        self.assertEqual(percentile(values, 99), 10)
+
+
+class SummariseTests(TestCase):
+
+    def test_error_and_lock_timeout_rates(self):
+        results = (
+            [result() for _ in range(0, 6)]
+            + [result('lock-timeout'), result('lock-timeout'), result('action-failed'), result('http')]
+        )
+        summary = summarise(results, 2)
+
+        self.assertEqual(summary['requests'], 10)
+        self.assertEqual(summary['successful'], 6)
+        self.assertEqual(summary['throughput'], 3)
+        self.assertEqual(summary['errors']['lock-timeout'], 2)
+        self.assertEqual(summary['errors']['action-failed'], 1)
+        self.assertEqual(summary['errors']['http'], 1)
+        self.assertAlmostEqual(summary['error_rate'], 0.4)
+        self.assertAlmostEqual(summary['lock_timeout_rate'], 0.2)
+
+    def test_latency_only_covers_successful_requests(self):
+        summary = summarise([result(elapsed=0.01), result('timeout', elapsed=30)], 1)
+        self.assertAlmostEqual(summary['p99'], 10)
+        self.assertAlmostEqual(summary['max'], 10)
+
+    def test_no_requests(self):
+        summary = summarise([], 0)
+        self.assertEqual(summary['throughput'], 0)
+        self.assertEqual(summary['error_rate'], 0)
+        self.assertEqual(summary['lock_timeout_rate'], 0)
+        self.assertIsNone(summary['p50'])
+
+
+class FormatChangeTests(TestCase):
+
+    def test_rates_change_in_percentage_points(self):
+        self.assertEqual(format_change('error_rate', 0.15, 0.1), '+5.00pp')
+        self.assertEqual(format_change('lock_timeout_rate', 0, 0.02), '-2.00pp')
+
+    def test_rates_change_from_a_zero_baseline(self):
+        self.assertEqual(format_change('error_rate', 0.05, 0), '+5.00pp')
+
+    def test_other_metrics_change_relatively(self):
+        self.assertEqual(format_change('throughput', 150, 100), '+50.0%')
+        self.assertEqual(format_change('p95', 90, 120), '-25.0%')
+
+    def test_no_relative_change_from_a_zero_baseline(self):
+        self.assertEqual(format_change('throughput', 10, 0), '')
+
+    def test_missing_values(self):
+        self.assertEqual(format_change('p50', None, 10), '')
+        self.assertEqual(format_change('p50', 10, None), '')
+
+
+class ParseMixTests(TestCase):
+
+    def test_parses_weights(self):
+        self.assertEqual(parse_mix('changelist=70, search=30'), {'changelist': 70, 'search': 30})
+
+    def test_rejects_unknown_scenarios(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_mix('changelist=1,homepage=1')
+
+    def test_rejects_invalid_weights(self):
+        for weight in ('-5', 'nan', 'inf', 'abc', ''):
+            with self.subTest(weight=weight), self.assertRaises(argparse.ArgumentTypeError):
+                parse_mix(f'changelist=1,search={weight}')
+
+    def test_rejects_all_zero_weights(self):
+        with self.assertRaises(argparse.ArgumentTypeError):
+            parse_mix('changelist=0,search=0')